@@ -1,12 +1,35 @@
 #!/usr/bin/env python3
+import os
 from pathlib import Path
-import textwrap
-
+from typing import Iterator
 
 import pdoc.render
+from jinja2 import FileSystemBytecodeCache
 
 here = Path(__file__).parent
 
+# pdoc renders every page through a single module level jinja environment.
+# Templates don't change during a build, so skip the mtime check on every
+# `get_template`.
+env = pdoc.render.env
+env.auto_reload = False
+
+SITEMAP_HEADER = """<?xml version="1.0" encoding="utf-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
+   xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
+   xsi:schemaLocation="http://www.sitemaps.org/schemas/sitemap/0.9 http://www.sitemaps.org/schemas/sitemap/0.9/sitemap.xsd">"""
+
+
+def html_files(directory: str) -> Iterator[str]:
+    """Yield the paths of all public `.html` files below `directory`."""
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                yield from html_files(entry.path)
+            elif entry.name.endswith(".html") and not entry.name.startswith("_"):
+                yield entry.path
+
+
 if __name__ == "__main__":
     credence = here / ".." / "src" / "credence" / "__init__.py"
 
@@ -20,6 +43,13 @@ if __name__ == "__main__":
         # logo="/logo.svg",
         logo_link="https://github.com/GoSteadily/credence",
     )
+
+    # Persist compiled template bytecode between runs of this script so later
+    # builds load it instead of lexing, parsing and compiling every template.
+    cache_dir = here / ".jinja_cache"
+    cache_dir.mkdir(exist_ok=True)
+    env.bytecode_cache = FileSystemBytecodeCache(directory=str(cache_dir), pattern="%s.cache")
+
     pdoc.pdoc(
         credence,
         "!credence.exception",
@@ -29,21 +59,12 @@ if __name__ == "__main__":
     )
 
     # Add sitemap.xml
+    root = str(here)
+    parts = [SITEMAP_HEADER]
+    for file in html_files(root):
+        filename = file[len(root) + 1 :].replace(os.sep, "/").replace("index.html", "")
+        parts.append(f"""\n<url><loc>https://github.com/GoSteadily/credence/{filename}</loc></url>""")
+    parts.append("""\n</urlset>""")
+
     with (here / "docs" / "sitemap.xml").open("w", newline="\n") as f:
-        f.write(
-            textwrap.dedent(
-                """
-        <?xml version="1.0" encoding="utf-8"?>
-        <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
-           xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
-           xsi:schemaLocation="http://www.sitemaps.org/schemas/sitemap/0.9 http://www.sitemaps.org/schemas/sitemap/0.9/sitemap.xsd">
-        """
-            ).strip()
-        )
-        for file in here.glob("**/*.html"):
-            if file.name.startswith("_"):
-                continue
-            filename = str(file.relative_to(here).as_posix()).replace("index.html", "")
-            f.write(
-                f"""\n<url><loc>https://github.com/GoSteadily/credence/{filename}</loc></url>""")
-        f.write("""\n</urlset>""")
+        f.write("".join(parts))
@@ -1,23 +1,33 @@
 import abc
+import asyncio
 import logging
 import time
-from queue import Empty, Queue
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import cached_property
 from textwrap import dedent
-from typing import Any, Dict, List, Tuple
-
-from instructor import Instructor
-from openai.types.chat import ChatCompletionMessageParam, ChatCompletionSystemMessageParam
+from typing import TYPE_CHECKING, Any, ClassVar, Dict, List, Tuple
 
+from credence import metadata
 from credence.conversation import Conversation
+from credence.interaction import Interaction
 from credence.interaction.chatbot import (
     ChatbotIgnoresMessage,
     ChatbotResponds,
 )
+from credence.interaction.chatbot.check.response import ChatbotResponseAICheck
+from credence.interaction.external import External
 from credence.interaction.nested_conversation import NestedConversation
 from credence.interaction.user import UserGenerated, UserMessage
+from credence.llm_cache import LLMCache, cache_from_environment, cached_create
 from credence.result import Message, Result
 from credence.role import Role
 
+if TYPE_CHECKING:
+    from instructor import Instructor
+    from openai import OpenAI
+    from openai.types.chat import ChatCompletionMessageParam
+
 logger = logging.getLogger(__name__)
 """@private"""
 
@@ -25,6 +35,23 @@ default_user_simulator_system_prompt = (
     "You are now simulating a user who is interacting with a chatbot.\nDo not behave like an AI assistant, for example, don't offer to give assistance."
 )
 
+_user_simulator_system_prompt = dedent(default_user_simulator_system_prompt).strip()
+
+_client_executor = ThreadPoolExecutor(thread_name_prefix="credence-client")
+"""@private Creates adapter clients in the background, see `Adapter.prewarm_client`"""
+
+
+def _uses_llm(conversation: Conversation) -> bool:
+    for interaction in conversation.interactions:
+        if isinstance(interaction, UserGenerated):
+            return True
+        if isinstance(interaction, ChatbotResponds) and any(isinstance(expectation, ChatbotResponseAICheck) for expectation in interaction.expectations):
+            return True
+        if isinstance(interaction, NestedConversation) and _uses_llm(interaction.conversation):
+            return True
+
+    return False
+
 
 def _docstring_parameter(*sub):
     def dec(obj):
@@ -137,10 +164,7 @@ class Adapter(abc.ABC):
         ```
         """
 
-        self.queue: Queue[Tuple[int, str]] = Queue()
-        """@private"""
-
-        self.client: Instructor | None = None
+        self.queue: deque[Tuple[int, str]] = deque()
         """@private"""
 
         self.messages: List[Message] = []
@@ -149,18 +173,32 @@ class Adapter(abc.ABC):
         self.next_message_index: int = 0
         """@private"""
 
-        from credence import metadata
+        self.llm_history: List["ChatCompletionMessageParam"] = []
+        """@private The conversation so far, as shown to the user simulator"""
+
+        self.testing_time_ns: int = 0
+        """@private"""
+
+        self.client_future: "Future[Instructor] | None" = None
+        """@private"""
 
         metadata.set_adapter(self)
 
-    def __del__(self):
-        """Clear the metadata when destroying the adapter"""
-        try:
-            from credence import metadata
+    def __enter__(self):
+        """
+        Make this the adapter that collects metadata until the `with` block exits.
 
-            metadata.clear_adapter(None)
-        except Exception:
-            pass
+        ```python
+        with MyChatbotAdapter() as adapter:
+            result = adapter.test(conversation)
+        ```
+        """
+        metadata.set_adapter(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        if metadata.get_adapter() is self:
+            metadata.clear_adapter()
 
     def set_context(self, **kwargs: Dict[str, Any]):
         """
@@ -241,7 +279,7 @@ class Adapter(abc.ABC):
         """
 
     @abc.abstractmethod
-    def create_client(self) -> Instructor:
+    def create_client(self) -> "Instructor":
         """
         Create an instructor client for your adapter
 
@@ -266,38 +304,142 @@ class Adapter(abc.ABC):
         Define the name of the model to be used in generating user messages and running AI checks
         """
 
-    def get_client(self) -> Instructor:
+    prewarm_client: ClassVar[bool] = False
+    """
+    Set `prewarm_client = True` on your adapter to start creating the client in the
+    background when `test` starts, so that it is usually ready by the time the
+    conversation first needs it.
+
+    The client is only prewarmed for conversations that generate user messages or
+    run AI checks. If `create_client` fails, the error is raised when the client is
+    first used. Only enable this if `create_client` can run on another thread.
+    """
+
+    share_client: ClassVar[bool] = False
+    """
+    Set `share_client = True` on your adapter to reuse the first client it creates in
+    every instance of your adapter class, so each test doesn't pay for a new
+    connection pool and TLS handshake.
+
+    Only enable this if `create_client` doesn't depend on the state of each adapter
+    instance. Use `clear_shared_clients` to create new clients, e.g. after changing
+    API keys between tests.
+    """
+
+    shared_clients: ClassVar[Dict[type, "Instructor"]] = {}
+    """@private"""
+
+    @cached_property
+    def client(self) -> "Instructor":
         "@private"
-        if self.client is None:
-            self.client = self.create_client()
+        if self.share_client:
+            shared_client = self.shared_clients.get(type(self))
+            if shared_client is not None:
+                return shared_client
+
+        # Create the client here if the background creation hasn't started yet,
+        # rather than waiting behind other adapters' clients. If the background
+        # creation failed, `result` raises its error.
+        if self.client_future is not None and not self.client_future.cancel():
+            return self.client_future.result()
+
+        return self._create_client()
+
+    def _create_client(self) -> "Instructor":
+        client = self.create_client()
+        if self.share_client:
+            return self.shared_clients.setdefault(type(self), client)
+
+        return client
+
+    @classmethod
+    def clear_shared_clients(cls):
+        """
+        Forget the clients shared by this adapter class and its subclasses,
+        so the next adapter creates a new one. See `share_client`.
+        """
+        for adapter_class in list(cls.shared_clients):
+            if issubclass(adapter_class, cls):
+                cls.shared_clients.pop(adapter_class, None)
 
+    def get_client(self) -> "Instructor":
+        "@private"
         return self.client
 
+    def llm_cache(self) -> LLMCache | None:
+        """
+        Return an `credence.llm_cache.LLMCache` to reuse the responses to
+        identical LLM requests when generating user messages and running AI checks.
+
+        By default, credence only caches responses if the `CREDENCE_CACHE=1` environment
+        variable is set. Only enable the cache if your model answers identical requests
+        identically (e.g. `temperature=0`).
+        """
+        return cache_from_environment()
+
+    def raw_client(self) -> "OpenAI | None":
+        """
+        Return the OpenAI client used to generate user messages.
+
+        User messages are plain text, so they don't need instructor's structured
+        output handling. By default, credence sends them directly to the OpenAI
+        client wrapped by `create_client`, if it wraps one.
+
+        Return `None` to generate user messages through instructor.
+        """
+        from openai import OpenAI
+
+        client = getattr(self.client, "client", None)
+        return client if isinstance(client, OpenAI) else None
+
+    @cached_property
+    def _create_completion(self):
+        raw_client = self.raw_client()
+        if raw_client is None:
+            return self.client.chat.completions.create
+
+        create = raw_client.chat.completions.create
+
+        def create_text(model: str, response_model: type, messages: List["ChatCompletionMessageParam"], **kwargs):
+            content = create(model=model, messages=messages, **kwargs).choices[0].message.content
+            if content is None:
+                raise Exception("The LLM did not generate a user message")
+            return content
+
+        return create_text
+
+    @cached_property
+    def _model_name(self) -> str:
+        return self.model_name()
+
+    @cached_property
+    def _llm_cache(self) -> LLMCache | None:
+        return self.llm_cache()
+
+    @cached_property
+    def _user_simulator_prompt(self) -> str:
+        return self.user_simulator_system_prompt() or default_user_simulator_system_prompt
+
     def record_chatbot_message(self, chatbot_message: str):
         """
         Manually inform the adapter of a chatbot response message.
         See `handle_message` for more details.
+
+        Messages are buffered without locking, so this must be called from
+        the same thread that is running `test`.
         """
         self._add_message(Role.Chatbot, chatbot_message)
 
         return self
 
     def _add_message(self, role: Role, message: str):
-        from credence import metadata
-
         message_metadata = None
-        if role == Role.Chatbot:
-            self.queue.put_nowait((self.next_message_index, message))
+        if role is Role.Chatbot:
+            self.queue.append((self.next_message_index, message))
             message_metadata = metadata.get_values()
 
-        self.messages.append(
-            Message(
-                index=self.next_message_index,
-                role=role,
-                body=message,
-                metadata=message_metadata,
-            )
-        )
+        self.messages.append(Message(role, message, self.next_message_index, message_metadata))
+        self.llm_history.append(role.to_llm_message(message))
 
         self.next_message_index += 1
 
@@ -306,102 +448,191 @@ class Adapter(abc.ABC):
         Evaluate the conversation against your chatbot
         """
 
-        from credence.interaction.external import External
+        start_time = time.perf_counter_ns()
+        self.testing_time_ns = 0
 
-        start_time = time.time()
-        testing_time = 0.0
+        # Collect metadata for this adapter on whichever thread runs the test
+        metadata.set_adapter(self)
 
-        try:
-            for interaction in conversation.interactions:
-                if isinstance(interaction, NestedConversation):
-                    result = self.test(interaction.conversation)
-                    testing_time += result.testing_time_ms / 1000
-                    if result.errors:
-                        result.conversation = conversation
-                        result.chatbot_time_ms = round((time.time() - start_time - testing_time) * 1000)
-                        result.testing_time_ms = round(testing_time * 1000)
-                        return result
-
-                elif isinstance(interaction, External):
-                    interaction.call(self)
-
-                elif isinstance(interaction, UserMessage):
-                    self._assert_no_chatbot_messages()
-                    self._add_message(Role.User, interaction.text)
-
-                    chatbot_response = self.handle_message(interaction.text)
-
-                    if chatbot_response:
-                        self._add_message(Role.Chatbot, chatbot_response)
-
-                elif isinstance(interaction, UserGenerated):
-                    self._assert_no_chatbot_messages()
-
-                    generation_start_time = time.time()
-
-                    client = self.get_client()
-                    text = self._generate_user_message(client=client, interaction=interaction, messages=self.messages)
-                    testing_time += time.time() - generation_start_time
-
-                    self._add_message(Role.User, text)
-
-                    chatbot_response = self.handle_message(text)
-                    if chatbot_response:
-                        self._add_message(Role.Chatbot, chatbot_response)
-
-                elif isinstance(interaction, ChatbotResponds):
-                    generation_start_time = time.time()
-
-                    chatbot_response = self._get_queued_chatbot_message()
-                    exceptions = interaction.check(
-                        adapter=self,
-                        messages=self.messages,
-                        chatbot_response=chatbot_response,
-                    )
-
-                    if exceptions:
-                        return Result(
-                            conversation=conversation,
-                            messages=self.messages,
-                            errors=exceptions,
-                            testing_time_ms=round(testing_time * 1000),
-                            chatbot_time_ms=round((time.time() - start_time - testing_time) * 1000),
-                        )
-
-                    testing_time += time.time() - generation_start_time
-                elif isinstance(interaction, ChatbotIgnoresMessage):
-                    self._assert_no_chatbot_messages()
+        if (
+            self.prewarm_client
+            and self.client_future is None
+            and "client" not in self.__dict__
+            and not (self.share_client and type(self) in self.shared_clients)
+            and _uses_llm(conversation)
+        ):
+            self.client_future = _client_executor.submit(self._create_client)
 
+        try:
+            errors = self._run_interactions(conversation)
         except Exception as e:
             logger.exception("Test failed")
-            return Result(
-                conversation=conversation,
-                messages=self.messages,
-                errors=[e],
-                testing_time_ms=round(testing_time * 1000),
-                chatbot_time_ms=round((time.time() - start_time - testing_time) * 1000),
-            )
+            errors = [e]
 
         return Result(
             conversation=conversation,
             messages=self.messages,
-            errors=[],
-            testing_time_ms=round(testing_time * 1000),
-            chatbot_time_ms=round((time.time() - start_time - testing_time) * 1000),
+            errors=errors,
+            testing_time_ms=self.testing_time_ns // 1_000_000,
+            chatbot_time_ms=(time.perf_counter_ns() - start_time - self.testing_time_ns) // 1_000_000,
+        )
+
+    @classmethod
+    def run_conversations(cls, conversations: List[Conversation], max_concurrency: int = 8) -> List[Result]:
+        """
+        Evaluate several conversations concurrently, returning their results
+        in the same order as `conversations`.
+
+        Turns within a conversation depend on each other, but separate
+        conversations don't, so their LLM calls can overlap instead of
+        waiting on one another. Each conversation runs on its own thread
+        against a fresh instance of the adapter, created with no arguments.
+
+        While conversations run concurrently, `credence.collect_metadata` is tracked
+        per conversation thread, so your chatbot must collect metadata on the thread
+        that called `handle_message`.
+
+        ```python
+        results = MyChatbotAdapter.run_conversations(conversations(), max_concurrency=4)
+        ```
+        """
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            return list(executor.map(cls._test_isolated, conversations))
+
+    async def atest(self, conversation: Conversation) -> Result:
+        """
+        Evaluate the conversation against your chatbot without blocking the event loop.
+
+        The conversation runs on a worker thread, so your adapter's methods are
+        called from that thread.
+        """
+        return await asyncio.to_thread(self.test, conversation)
+
+    @classmethod
+    async def arun_conversations(cls, conversations: List[Conversation], max_concurrency: int = 8) -> List[Result]:
+        """
+        The `asyncio` counterpart of `run_conversations`. At most `max_concurrency`
+        conversations run at once, each on a worker thread against a fresh instance
+        of the adapter.
+
+        ```python
+        results = await MyChatbotAdapter.arun_conversations(conversations(), max_concurrency=4)
+        ```
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(conversation: Conversation) -> Result:
+            async with semaphore:
+                return await asyncio.to_thread(cls._test_isolated, conversation)
+
+        return list(await asyncio.gather(*(run(conversation) for conversation in conversations)))
+
+    @classmethod
+    def _test_isolated(cls, conversation: Conversation) -> Result:
+        # Concurrent conversations must not see each other's adapter or metadata
+        with metadata.isolated():
+            return cls().test(conversation)
+
+    def _run_interactions(self, conversation: Conversation) -> List[Exception]:
+        for interaction in conversation.interactions:
+            handler = getattr(self, self._interaction_handler_name(type(interaction)))
+
+            errors = handler(interaction)
+            if errors:
+                return errors
+
+        return []
+
+    @classmethod
+    def _interaction_handler_name(cls, interaction_type: type) -> str:
+        """
+        Find the name of the handler method for an interaction type. Subclasses of
+        known interactions use their base's handler and unknown interactions are skipped.
+
+        Lookups are cached on each adapter class, so adapters that extend
+        `interaction_handlers` don't share their results.
+        """
+        resolved = cls.__dict__.get("_resolved_interaction_handlers")
+        if resolved is None:
+            resolved = {}
+            cls._resolved_interaction_handlers = resolved
+
+        name = resolved.get(interaction_type)
+        if name is None:
+            name = "_skip_interaction"
+            for base in interaction_type.__mro__:
+                if base in cls.interaction_handlers:
+                    name = cls.interaction_handlers[base]
+                    break
+
+            resolved[interaction_type] = name
+
+        return name
+
+    def _skip_interaction(self, interaction: Interaction):
+        return None
+
+    def _handle_nested_conversation(self, interaction: NestedConversation):
+        return self._run_interactions(interaction.conversation)
+
+    def _handle_external(self, interaction: External):
+        interaction.call(self)
+
+    def _handle_user_message(self, interaction: UserMessage):
+        self._assert_no_chatbot_messages()
+        self._send_user_message(interaction.text)
+
+    def _handle_user_generated(self, interaction: UserGenerated):
+        self._assert_no_chatbot_messages()
+
+        generation_start_time = time.perf_counter_ns()
+        text = self._generate_user_message(interaction=interaction)
+        self.testing_time_ns += time.perf_counter_ns() - generation_start_time
+
+        self._send_user_message(text)
+
+    def _handle_chatbot_responds(self, interaction: ChatbotResponds):
+        generation_start_time = time.perf_counter_ns()
+
+        chatbot_response = self._get_queued_chatbot_message()
+        exceptions = interaction.check(
+            adapter=self,
+            messages=self.messages,
+            chatbot_response=chatbot_response,
         )
 
+        self.testing_time_ns += time.perf_counter_ns() - generation_start_time
+        return exceptions
+
+    def _handle_chatbot_ignores_message(self, interaction: ChatbotIgnoresMessage):
+        self._assert_no_chatbot_messages()
+
+    interaction_handlers: ClassVar[Dict[type, str]] = {
+        NestedConversation: "_handle_nested_conversation",
+        External: "_handle_external",
+        UserMessage: "_handle_user_message",
+        UserGenerated: "_handle_user_generated",
+        ChatbotResponds: "_handle_chatbot_responds",
+        ChatbotIgnoresMessage: "_handle_chatbot_ignores_message",
+    }
+    """@private The name of the method that handles each type of interaction. Subclasses can override the methods."""
+
+    def _send_user_message(self, text: str):
+        self._add_message(Role.User, text)
+
+        chatbot_response = self.handle_message(text)
+        if chatbot_response:
+            self._add_message(Role.Chatbot, chatbot_response)
+
     def _assert_no_chatbot_messages(self):
-        try:
-            message = self.queue.get_nowait()
-            raise Exception(f"Unexpected chatbot message: {message}")
-        except Empty:
-            return None
+        if self.queue:
+            raise Exception(f"Unexpected chatbot message: {self.queue[0]}")
 
     def _get_queued_chatbot_message(self):
-        try:
-            return self.queue.get_nowait()
-        except Empty:
-            raise Exception("Expected a chatbot message but none had been sent") from None
+        if not self.queue:
+            raise Exception("Expected a chatbot message but none had been sent")
+
+        return self.queue.popleft()
 
     @_docstring_parameter(default_user_simulator_system_prompt)
     def user_simulator_system_prompt(self) -> str | None:
@@ -413,36 +644,37 @@ class Adapter(abc.ABC):
         ```
 
         You can override the prompt by overriding the `user_simulator_system_prompt`
-        method and returning an alternative prompt.
-        """
-        return dedent(default_user_simulator_system_prompt).strip()
-
-    def _generate_user_message(
-        self,
-        client: Instructor,
-        interaction: UserGenerated,
-        messages: List[Message],
-    ):
-        llm_messages: List[ChatCompletionMessageParam] = []
-
-        prompt = self.user_simulator_system_prompt() or default_user_simulator_system_prompt
-        if messages:
-            context = "\nContext:"
-            for message in messages:
-                context += f"{str(message.role)}: {message.body}\n"
-
-            prompt += context
-
-        llm_messages.append(
-            ChatCompletionSystemMessageParam(
-                role="system",
-                content=prompt,
-            )
-        )
+        method and returning an alternative prompt. It is called once per adapter.
+        """
+        return _user_simulator_system_prompt
 
-        llm_messages.append(Role.Chatbot.to_llm_message(interaction.prompt))
-        return client.chat.completions.create(
-            model=self.model_name(),
+    def user_simulator_history_window(self) -> int | None:
+        """
+        By default, the user simulator sees every message in the conversation so far.
+
+        For long conversations, you can override `user_simulator_history_window`
+        and return the number of most recent messages the simulator should see.
+        """
+        return None
+
+    def _generate_user_message(self, interaction: UserGenerated):
+        history = self.llm_history
+        window = self.user_simulator_history_window()
+        if window is not None:
+            history = history[-window:] if window > 0 else []
+
+        # The system prompt and earlier turns stay the same between calls, so
+        # providers can reuse their cached prefix of the request
+        llm_messages: List[ChatCompletionMessageParam] = [
+            {"role": "system", "content": self._user_simulator_prompt},
+            *history,
+            Role.Chatbot.to_llm_message(interaction.prompt),
+        ]
+
+        return cached_create(
+            self._llm_cache,
+            self._create_completion,
+            model=self._model_name,
             response_model=str,
             messages=llm_messages,
         )
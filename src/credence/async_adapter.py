@@ -0,0 +1,76 @@
+import abc
+import asyncio
+import inspect
+
+from credence.adapter import Adapter
+from credence.conversation import Conversation
+from credence.interaction.external import External
+from credence.result import Result
+from credence.role import Role
+
+
+class AsyncAdapter(Adapter):
+    """
+    `AsyncAdapter` allows credence to test chatbots whose `handle_message`
+    is a coroutine, such as chatbots built on FastAPI or other `asyncio` frameworks.
+
+    It is used like `credence.adapter.Adapter`, except that `handle_message`, and
+    optionally the methods called by `External` interactions, are `async`:
+
+    ```python
+    from credence.async_adapter import AsyncAdapter
+
+    class MyChatbotAdapter(AsyncAdapter):
+        def create_client(self):
+            ...
+
+        def model_name(self):
+            ...
+
+        async def handle_message(self, message: str) -> str | None:
+            return await my_app.chatbot.process_message(message)
+
+        async def register_user(self, name: str):
+            self.context["user"] = await my_app.register_user(name)
+    ```
+
+    Each test runs its coroutines on an event loop of its own, on the thread
+    running the test. `test` can therefore be called from synchronous code, while
+    `atest` and `arun_conversations` keep your event loop free. Your chatbot should
+    not reuse async resources (e.g. connection pools) bound to another event loop.
+    """
+
+    def __init__(self):
+        super().__init__()
+
+        self.runner: asyncio.Runner | None = None
+        """@private Runs the coroutines of the conversation being tested"""
+
+    @abc.abstractmethod
+    async def handle_message(self, message: str):
+        """
+        Call your chatbot to handle a message. See `credence.adapter.Adapter.handle_message`.
+        """
+
+    def test(self, conversation: Conversation) -> Result:
+        """
+        Evaluate the conversation against your chatbot
+        """
+        with asyncio.Runner() as runner:
+            self.runner = runner
+            try:
+                return super().test(conversation)
+            finally:
+                self.runner = None
+
+    def _send_user_message(self, text: str):
+        self._add_message(Role.User, text)
+
+        chatbot_response = self.runner.run(self.handle_message(text))
+        if chatbot_response:
+            self._add_message(Role.Chatbot, chatbot_response)
+
+    def _handle_external(self, interaction: External):
+        result = interaction.call(self)
+        if inspect.iscoroutine(result):
+            self.runner.run(result)
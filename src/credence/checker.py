@@ -1,14 +1,15 @@
 import abc
 import logging
-from queue import Queue
+from functools import cached_property
 from textwrap import dedent
-from typing import Any, Dict, List, Tuple
+from typing import ClassVar, List
 
 import instructor
 from instructor import Instructor
-from openai.types.chat import ChatCompletionMessageParam, ChatCompletionSystemMessageParam, ChatCompletionUserMessageParam
+from openai.types.chat import ChatCompletionMessageParam
 from pydantic import BaseModel, Field
 
+from credence.llm_cache import LLMCache, cache_from_environment, cached_create
 from credence.result import Message
 
 logger = logging.getLogger(__name__)
@@ -16,6 +17,8 @@ logger = logging.getLogger(__name__)
 
 default_checker_system_prompt = "You are quality assurance system that confirms whether the responses given by an assistant meet a requirement.\nDon't be too strict with your analysis. If the response is close to meeting the requirement, then give it a pass."
 
+_checker_system_prompt = dedent(default_checker_system_prompt).strip()
+
 
 def _docstring_parameter(*sub):
     def dec(obj):
@@ -62,12 +65,6 @@ class LLMChecker(abc.ABC):
     ```
     """
 
-    def __init__(self):
-        super().__init__()
-        
-        self.client: Instructor | None = None
-        """@private"""
-
     @abc.abstractmethod
     def create_client(self) -> Instructor:
         """
@@ -94,13 +91,29 @@ class LLMChecker(abc.ABC):
         Define the name of the model to be used when running AI checks
         """
 
-    def get_client(self) -> Instructor:
+    @cached_property
+    def client(self) -> Instructor:
         "@private"
-        if self.client is None:
-            self.client = self.create_client()
+        return self.create_client()
 
+    def get_client(self) -> Instructor:
+        "@private"
         return self.client
 
+    def llm_cache(self) -> LLMCache | None:
+        """
+        Return an `credence.llm_cache.LLMCache` to reuse the verdicts of identical assertions.
+
+        By default, credence only caches verdicts if the `CREDENCE_CACHE=1` environment
+        variable is set. Only enable the cache if your model answers identical requests
+        identically (e.g. `temperature=0`).
+        """
+        return cache_from_environment()
+
+    @cached_property
+    def _llm_cache(self) -> LLMCache | None:
+        return self.llm_cache()
+
     @_docstring_parameter(default_checker_system_prompt)
     def checker_system_prompt(self) -> str | None:
         """
@@ -113,15 +126,16 @@ class LLMChecker(abc.ABC):
         You can override the prompt by overriding the `checker_system_prompt`
         method and returning an alternative prompt.
         """
-        return dedent(default_checker_system_prompt).strip()
+        return _checker_system_prompt
 
     def assert_that(self, text: str, assertion: str):
         r = AssertionCheck.check(
-            client=self.get_client(),
+            client=self.client,
             model_name=self.model_name(),
             prompt=self.checker_system_prompt() or default_checker_system_prompt,
             text=text,
             assertion=assertion,
+            cache=self._llm_cache,
         )
 
         assert r.assertion_is_true, r.reason
@@ -142,6 +156,9 @@ class AssertionCheck(BaseModel):
     assertion_is_true: bool = Field(
         description="Whether or not the response meets the assertion.")
 
+    exact_cache_only: ClassVar[bool] = True
+    """@private Verdicts are only reused for identical requests, see `credence.llm_cache.SemanticCache`"""
+
     @staticmethod
     def check(
         client: instructor.Instructor,
@@ -152,31 +169,30 @@ class AssertionCheck(BaseModel):
         # For brittle tests, increase retries to give the LLM
         # multiple chances to mark a requirement as met
         retries: int = 0,
+        cache: LLMCache | None = None,
+        refresh: bool = False,
     ) -> "AssertionCheck":
         request_messages: List[ChatCompletionMessageParam] = [
-            ChatCompletionSystemMessageParam(
-                role="system",
-                content=prompt.strip(),
-            )
+            {
+                "role": "system",
+                "content": prompt.strip(),
+            }
         ]
 
         request_messages.append(
-            ChatCompletionUserMessageParam(
-                role="user",
-                content=dedent(
-                    f"""
-                    Message: {text}
-
-                    Is it true that the message {assertion}
-                    """
-                ).strip(),
-            ),
+            {
+                "role": "user",
+                "content": f"Message: {text}\n\nIs it true that the message {assertion}",
+            },
         )
 
-        result: AssertionCheck = client.chat.completions.create(
+        result: AssertionCheck = cached_create(
+            cache,
+            client.chat.completions.create,
             model=model_name,
             response_model=AssertionCheck,
             messages=request_messages,
+            refresh=refresh,
             # If the response is invalid, retry once
             max_retries=1,
         )
@@ -184,13 +200,16 @@ class AssertionCheck(BaseModel):
         result.assertion = assertion
 
         if not result.assertion_is_true and retries > 0:
-            return AssertionCheck.check_requirement(
+            return AssertionCheck.check(
                 client=client,
                 model_name=model_name,
                 prompt=prompt,
                 text=text,
                 assertion=assertion,
                 retries=retries - 1,
+                cache=cache,
+                # A retry needs a fresh answer, not the cached failure
+                refresh=True,
             )
 
         return result
@@ -1,11 +1,12 @@
 import copy
 from dataclasses import dataclass
+from textwrap import indent
 from typing import List
 
 from credence.interaction import Interaction
 
 
-@dataclass
+@dataclass(slots=True)
 class Conversation:
     """
     A `Conversation` is used to test a chatbot.
@@ -50,14 +51,7 @@ class Conversation:
         """
         Generate the code used to create an interaction
         """
-        interactions_str = ""
-        for index, interaction in enumerate(self.interactions):
-            if index != 0:
-                interactions_str += ","
-
-            interaction_str = str(interaction)
-            interaction_str = "".join([f"      {line}" for line in interaction_str.splitlines(keepends=True)])
-            interactions_str += f"\n{interaction_str}"
+        interactions_str = ",".join(f"\n{indent(str(interaction), '      ')}" for interaction in self.interactions)
 
         closing_newline = ""
         if len(self.interactions) > 0:
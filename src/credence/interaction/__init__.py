@@ -4,6 +4,9 @@ import abc
 class Interaction(abc.ABC):
     """"""
 
+    # Lets dataclass interactions use slots instead of a per-instance __dict__
+    __slots__ = ()
+
     @abc.abstractmethod
     def is_user_interaction(self) -> bool:
         "@private"
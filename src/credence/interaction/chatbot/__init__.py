@@ -1,12 +1,18 @@
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import List, Tuple
+from textwrap import indent
+from typing import ClassVar, Dict, List, Tuple
 
+from credence import metadata
 from credence.interaction import Interaction
 from credence.interaction.chatbot.check import BaseCheck
 from credence.interaction.chatbot.check.metadata import ChatbotMetadataCheck
 from credence.interaction.chatbot.check.response import ChatbotResponseAICheck, ChatbotResponseCheck
 from credence.message import Message
 
+_MISSING = object()
+"""@private Marks a metadata key that was not collected"""
+
 
 class Chatbot:
     @staticmethod
@@ -18,7 +24,7 @@ class Chatbot:
         return ChatbotIgnoresMessage()
 
 
-@dataclass
+@dataclass(slots=True)
 class ChatbotResponds(Interaction):
     """@private"""
 
@@ -26,12 +32,7 @@ class ChatbotResponds(Interaction):
 
     def __str__(self):
         """@private"""
-        expectations_str = ""
-        for expectation in self.expectations:
-            expectations_str += "\n"
-            for line in str(expectation).splitlines(keepends=True):
-                expectations_str += f"    {line}"
-            expectations_str += ","
+        expectations_str = "".join(f"\n{indent(str(expectation), '    ')}," for expectation in self.expectations)
 
         closing_str = "]\n"
         if len(self.expectations) > 0:
@@ -47,32 +48,123 @@ Chatbot.responds([{expectations_str}{closing_str})
         messages: List[Message],
         chatbot_response: Tuple[int, str],
     ) -> List[Exception]:
-        from credence import metadata
+        # Checks on a response are independent, so run the local checks first and
+        # only pay for the LLM calls of AI checks if the response could still pass
+        local_expectations = [expectation for expectation in self.expectations if not isinstance(expectation, ChatbotResponseAICheck)]
+        ai_expectations = [expectation for expectation in self.expectations if isinstance(expectation, ChatbotResponseAICheck)]
+
+        exceptions_by_check: Dict[int, List[Exception]] = {}
+        for expectation in local_expectations:
+            exceptions_by_check[id(expectation)] = self._check_expectation(expectation, adapter, messages, chatbot_response, ai_check_kwargs={})
+
+        if ai_expectations and any(exceptions_by_check.values()):
+            for expectation in ai_expectations:
+                # The check never ran, so it is reported as neither passed nor failed
+                expectation.passed = None
+
+        elif ai_expectations:
+            # The client, model and cache are the same for every AI check in this step
+            ai_check_kwargs = {"client": adapter.client, "model_name": adapter.model_name(), "cache": adapter._llm_cache}
+            ai_exceptions = self._check_ai_expectations(ai_expectations, adapter, messages, chatbot_response, ai_check_kwargs)
+            exceptions_by_check.update(zip(map(id, ai_expectations), ai_exceptions, strict=True))
 
-        exceptions = []
-        for expectation in self.expectations:
-            if isinstance(expectation, ChatbotResponseAICheck):
-                exceptions.extend(
-                    expectation.check(value=messages, adapter=adapter),
-                )
+        metadata.clear()
 
-            elif isinstance(expectation, ChatbotResponseCheck):
-                exceptions.extend(
-                    expectation.check(value=chatbot_response),
-                )
+        # Report errors in the order the checks were written
+        return [exception for expectation in self.expectations for exception in exceptions_by_check.get(id(expectation), [])]
+
+    def _check_expectation(
+        self,
+        expectation: BaseCheck,
+        adapter,
+        messages: List[Message],
+        chatbot_response: Tuple[int, str],
+        ai_check_kwargs: Dict,
+    ) -> List[Exception]:
+        handler = getattr(self, self._expectation_handler_name(type(expectation)))
 
-            elif isinstance(expectation, ChatbotMetadataCheck):
-                try:
-                    value = metadata.get_value(expectation.key)
-                    exceptions.extend(
-                        expectation.check(value),
-                    )
-                except Exception as e:
-                    expectation.passed = False
-                    exceptions.append(e)
+        return handler(
+            expectation,
+            adapter=adapter,
+            messages=messages,
+            chatbot_response=chatbot_response,
+            ai_check_kwargs=ai_check_kwargs,
+        )
 
-        metadata.clear()
-        return exceptions
+    def _check_ai_expectations(
+        self,
+        expectations: List[BaseCheck],
+        adapter,
+        messages: List[Message],
+        chatbot_response: Tuple[int, str],
+        ai_check_kwargs: Dict,
+    ) -> List[List[Exception]]:
+        if len(expectations) == 1:
+            return [self._check_expectation(expectations[0], adapter, messages, chatbot_response, ai_check_kwargs)]
+
+        # Each AI check is an independent LLM request, so the step only waits for the slowest one
+        with ThreadPoolExecutor(max_workers=len(expectations), thread_name_prefix="credence-ai-check") as executor:
+            return list(
+                executor.map(
+                    lambda expectation: self._check_expectation(expectation, adapter, messages, chatbot_response, ai_check_kwargs),
+                    expectations,
+                )
+            )
+
+    @classmethod
+    def _expectation_handler_name(cls, expectation_type: type) -> str:
+        """
+        Find the name of the handler method for a check type. Subclasses of
+        known checks use their base's handler and unknown checks are skipped.
+
+        Lookups are cached on each class, so subclasses that extend
+        `expectation_handlers` don't share their results.
+        """
+        resolved = cls.__dict__.get("_resolved_expectation_handlers")
+        if resolved is None:
+            resolved = {}
+            cls._resolved_expectation_handlers = resolved
+
+        name = resolved.get(expectation_type)
+        if name is None:
+            name = "_skip_expectation"
+            for base in expectation_type.__mro__:
+                if base in cls.expectation_handlers:
+                    name = cls.expectation_handlers[base]
+                    break
+
+            resolved[expectation_type] = name
+
+        return name
+
+    def _check_ai_expectation(self, expectation: ChatbotResponseAICheck, adapter, messages, chatbot_response, ai_check_kwargs):
+        return expectation.check(value=messages, adapter=adapter, **ai_check_kwargs)
+
+    def _check_response_expectation(self, expectation: ChatbotResponseCheck, adapter, messages, chatbot_response, ai_check_kwargs):
+        return expectation.check(value=chatbot_response)
+
+    def _check_metadata_expectation(self, expectation: ChatbotMetadataCheck, adapter, messages, chatbot_response, ai_check_kwargs):
+        # Look the key up without raising, since a missing key is an ordinary failed check
+        value = metadata.get_values().get(expectation.key, _MISSING)
+        if value is _MISSING:
+            expectation.passed = False
+            return [metadata.missing_key_error(expectation.key)]
+
+        try:
+            return expectation.check(value)
+        except Exception as e:
+            expectation.passed = False
+            return [e]
+
+    def _skip_expectation(self, expectation: BaseCheck, adapter, messages, chatbot_response, ai_check_kwargs):
+        return []
+
+    expectation_handlers: ClassVar[Dict[type, str]] = {
+        ChatbotResponseAICheck: "_check_ai_expectation",
+        ChatbotResponseCheck: "_check_response_expectation",
+        ChatbotMetadataCheck: "_check_metadata_expectation",
+    }
+    """@private The name of the method that checks each type of expectation. Subclasses can override the methods."""
 
     def is_user_interaction(self) -> bool:
         return False
@@ -81,7 +173,7 @@ Chatbot.responds([{expectations_str}{closing_str})
         return True
 
 
-@dataclass
+@dataclass(slots=True)
 class ChatbotIgnoresMessage(Interaction):
     """@private"""
 
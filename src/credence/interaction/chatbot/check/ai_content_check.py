@@ -1,15 +1,19 @@
 import logging
+from functools import cached_property
 from textwrap import dedent
-from typing import List
+from typing import TYPE_CHECKING, ClassVar, List
 
-import instructor
-from openai.types.chat import ChatCompletionMessageParam, ChatCompletionSystemMessageParam, ChatCompletionUserMessageParam
 from pydantic import BaseModel, Field
 from termcolor import colored
 
 from credence.exceptions import ColoredException
+from credence.llm_cache import LLMCache, cached_create
 from credence.message import Message
 
+if TYPE_CHECKING:
+    import instructor
+    from openai.types.chat import ChatCompletionMessageParam
+
 """@private"""
 
 
@@ -31,59 +35,65 @@ class AIContentCheck(BaseModel):
     )
     requirement_met: bool = Field(description="Whether or not the response meets the requirements.")
 
+    exact_cache_only: ClassVar[bool] = True
+    """@private Verdicts are only reused for identical requests, see `credence.llm_cache.SemanticCache`"""
+
     @staticmethod
     def check_requirement(
-        client: instructor.Instructor,
+        client: "instructor.Instructor",
         model_name: str,
         messages: List[Message],
         requirement: str,
         # For brittle tests, increase retries to give the LLM
         # multiple chances to mark a requirement as met
         retries: int = 0,
+        cache: LLMCache | None = None,
+        refresh: bool = False,
     ) -> "AIContentCheck":
         request_messages: List[ChatCompletionMessageParam] = [
-            ChatCompletionSystemMessageParam(
-                role="system",
-                content="""
+            {
+                "role": "system",
+                "content": """
                     You are quality assurance system that confirms whether the responses given by an assistant meet a requirement.
                     Don't be too strict with your analysis. If the response is close to meeting the requirement, then give it a pass.
                     """.strip(),
-            )
+            }
         ]
 
         if messages:
-            chat_log = ""
-            for message in messages:
-                chat_log = chat_log + f"{message.role.value}: {message.body}\n"
+            chat_log = "".join(f"{message.role.value}: {message.body}\n" for message in messages)
 
             request_messages.append(
-                ChatCompletionUserMessageParam(
-                    role="user",
-                    content=f"""
+                {
+                    "role": "user",
+                    "content": f"""
                     This is the chatbot log:
 
                     {chat_log}
                     """.strip(),
-                )
+                }
             )
 
         request_messages.append(
-            ChatCompletionUserMessageParam(
-                role="user",
-                content=dedent(
+            {
+                "role": "user",
+                "content": dedent(
                     f"""
                     Does the assistant's response meet the following requirement:
 
                     The assistant should {requirement}
                     """
                 ).strip(),
-            ),
+            },
         )
 
-        result: AIContentCheck = client.chat.completions.create(
+        result: AIContentCheck = cached_create(
+            cache,
+            client.chat.completions.create,
             model=model_name,
             response_model=AIContentCheck,
             messages=request_messages,
+            refresh=refresh,
             # If the response is invalid, retry once
             max_retries=1,
         )
@@ -99,28 +109,15 @@ class AIContentCheck(BaseModel):
                 messages=messages,
                 requirement=requirement,
                 retries=retries - 1,
+                cache=cache,
+                refresh=True,
             )
 
         return result
 
     def generate_error(self, chatbot_response: tuple[int, str]):
         if not self.requirement_met:
-            return ColoredException(
-                chatbot_response[0],
-                self._exception_message(
-                    chatbot_response=chatbot_response[1],
-                    colorize=False,
-                ),
-                self._exception_message(
-                    chatbot_response=chatbot_response[1],
-                    colorize=True,
-                ),
-                self._exception_message(
-                    chatbot_response=chatbot_response[1],
-                    colorize=False,
-                    markdown=True,
-                ),
-            )
+            return AIContentCheckException(chatbot_response[0], self, chatbot_response[1])
 
     def _exception_message(self, chatbot_response: str, colorize: bool, markdown: bool = False):
         if markdown:
@@ -142,6 +139,29 @@ class AIContentCheck(BaseModel):
             )
 
 
+class AIContentCheckException(ColoredException):
+    """
+    @private
+
+    A failed AI check. The colored and markdown messages are only
+    formatted if the error is shown.
+    """
+
+    def __init__(self, index: int, check: AIContentCheck, chatbot_response: str):
+        Exception.__init__(self, check._exception_message(chatbot_response=chatbot_response, colorize=False))
+        self.index = index
+        self.check = check
+        self.chatbot_response = chatbot_response
+
+    @cached_property
+    def colored_message(self) -> str:
+        return self.check._exception_message(chatbot_response=self.chatbot_response, colorize=True)
+
+    @cached_property
+    def markdown_message(self) -> str:
+        return self.check._exception_message(chatbot_response=self.chatbot_response, colorize=False, markdown=True)
+
+
 def maybe_colored(colorize: bool, str, **kwargs):
     """
     @private
@@ -1,13 +1,15 @@
 import abc
+import re
 from dataclasses import dataclass
+from functools import lru_cache
 
 
 @dataclass(kw_only=True)
 class BaseCheck(abc.ABC):
     """@private"""
 
-    passed: bool = True
-    """@private"""
+    passed: bool | None = True
+    """@private `None` if the check was skipped"""
 
     @abc.abstractmethod
     def __str__(self):
@@ -38,3 +40,14 @@ class BaseCheck(abc.ABC):
             return [exception]
         else:
             return []
+
+
+@lru_cache(maxsize=256)
+def compile_regex(regexp: str) -> re.Pattern:
+    """
+    @private
+
+    Compile a regex, sharing the compiled pattern between checks
+    built from the same expression.
+    """
+    return re.compile(regexp)
@@ -2,7 +2,7 @@ import re
 from dataclasses import dataclass
 from typing import Any
 
-from credence.interaction.chatbot.check.base import BaseCheck
+from credence.interaction.chatbot.check.base import BaseCheck, compile_regex
 
 
 @dataclass
@@ -94,7 +94,7 @@ class Metadata:
 
     def re_match(self, regexp: str):
         try:
-            pattern = re.compile(regexp)
+            pattern = compile_regex(regexp)
             return ChatbotMetadataRegexMatch(key=self.field, pattern=pattern)
         except Exception as e:
             try:
@@ -175,7 +175,7 @@ class ChatbotMetadataRegexMatch(ChatbotMetadataCheck):
         return f"metadata `{self.key}` should match `{self.pattern.pattern}`"
 
     def find_error(self, value):
-        if re.search(self.pattern, str(value)) is None:
+        if self.pattern.search(str(value)) is None:
             return Exception(f"Expected metadata[`{self.key}`] to match the regex `{self.pattern.pattern}`, found: `{value}`")
 
 
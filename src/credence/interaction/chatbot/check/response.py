@@ -4,7 +4,7 @@ from typing import List, Tuple
 
 from credence.exceptions import ChatbotIndexedException
 from credence.interaction.chatbot.check.ai_content_check import AIContentCheck
-from credence.interaction.chatbot.check.base import BaseCheck
+from credence.interaction.chatbot.check.base import BaseCheck, compile_regex
 from credence.message import Message
 from credence.role import Role
 
@@ -42,7 +42,7 @@ class Response:
     @staticmethod
     def re_match(regexp: str):
         try:
-            pattern = re.compile(regexp)
+            pattern = compile_regex(regexp)
             return ChatbotResponseRegexMatch(pattern=pattern)
         except Exception as e:
             try:
@@ -75,22 +75,23 @@ class ChatbotResponseAICheck(BaseCheck):
     def humanize(self):
         return f"should {self.prompt}"
 
-    def find_error(self, messages: List[Message], adapter):
+    def find_error(self, messages: List[Message], adapter, client=None, model_name: str | None = None, cache=None):
         from credence.adapter import Adapter
 
         if not isinstance(adapter, Adapter):
             raise Exception(f"{adapter} is not a valid Adapter")
 
         result = AIContentCheck.check_requirement(
-            client=adapter.get_client(),
-            model_name=adapter.model_name(),
+            client=client or adapter.client,
+            model_name=model_name or adapter.model_name(),
             messages=messages,
             requirement=self.prompt,
+            cache=cache or adapter._llm_cache,
         )
 
         last_assistant_message = (0, "None")
         for message in reversed(messages):
-            if message.role == Role.Chatbot:
+            if message.role is Role.Chatbot:
                 last_assistant_message = (message.index, message.body)
                 break
 
@@ -193,7 +194,7 @@ class ChatbotResponseRegexMatch(ChatbotResponseCheck):
 
     def find_error(self, value):
         value = prepare_value(value)
-        if re.search(self.pattern, value[1]) is None:
+        if self.pattern.search(value[1]) is None:
             return ChatbotIndexedException(value[0], f"Expected chatbot response to match the regex `{self.pattern.pattern}`, but found `{str_repr(value[1])}`")
 
 
@@ -1,11 +1,13 @@
 from dataclasses import dataclass, field
-from typing import Dict
+from typing import TYPE_CHECKING, Dict
 
-from credence.adapter import Adapter
 from credence.interaction import Interaction
 
+if TYPE_CHECKING:
+    from credence.adapter import Adapter
 
-@dataclass
+
+@dataclass(slots=True)
 class External(Interaction):
     """
     `External` interactions allow you to run any function defined in an
@@ -27,12 +29,12 @@ class External(Interaction):
     """The keyword arguments that will be applied to the function."""
 
     def call(self, adapter: "Adapter"):
-        if hasattr(adapter, self.function) and callable(getattr(adapter, self.function)):
-            func = getattr(adapter, self.function)
-            func(**self.kwargs)
-        else:
+        func = getattr(adapter, self.function, None)
+        if func is None or not callable(func):
             raise Exception(f"Function not defined: {self.function}")
 
+        return func(**self.kwargs)
+
     def __str__(self):
         """ """
         name = self.function.__repr__()
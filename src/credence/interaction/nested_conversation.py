@@ -1,10 +1,11 @@
 from dataclasses import dataclass
+from textwrap import indent
 
 from credence.conversation import Conversation
 from credence.interaction import Interaction
 
 
-@dataclass
+@dataclass(slots=True)
 class NestedConversation(Interaction):
     """
     `NestedConversation`s allow us to include an existing conversation's
@@ -57,8 +58,7 @@ class NestedConversation(Interaction):
     """@private The nested conversation"""
 
     def __str__(self):
-        nested_conversation_str = str(self.conversation)
-        nested_conversation_str = "".join([f"  {line}" for line in nested_conversation_str.splitlines(keepends=True)]).strip()
+        nested_conversation_str = indent(str(self.conversation), "  ").strip()
 
         return f"""
 Conversation.nested(
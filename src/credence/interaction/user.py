@@ -3,7 +3,7 @@ from dataclasses import dataclass
 from credence.interaction import Interaction
 
 
-@dataclass
+@dataclass(slots=True)
 class UserMessage(Interaction):
     """@private"""
 
@@ -16,7 +16,7 @@ class UserMessage(Interaction):
         return False
 
 
-@dataclass
+@dataclass(slots=True)
 class UserGenerated(Interaction):
     """@private"""
 
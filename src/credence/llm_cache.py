@@ -0,0 +1,367 @@
+import hashlib
+import json
+import math
+import operator
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, List, Protocol, Tuple
+
+from pydantic import TypeAdapter
+
+
+class CacheBackend(Protocol):
+    """
+    The storage used by an `LLMCache`. Values are serialized responses.
+    """
+
+    def get(self, key: str) -> str | None: ...
+
+    def set(self, key: str, value: str): ...
+
+    def delete(self, key: str): ...
+
+
+class MemoryBackend:
+    """
+    Keep cached responses in memory, evicting the least recently used
+    response once `maxsize` responses are stored.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        """@private"""
+
+        self.values: OrderedDict[str, str] = OrderedDict()
+        """@private"""
+
+        self.lock = threading.Lock()
+        """@private"""
+
+    def get(self, key: str) -> str | None:
+        with self.lock:
+            value = self.values.get(key)
+            if value is not None:
+                self.values.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str):
+        with self.lock:
+            self.values[key] = value
+            self.values.move_to_end(key)
+            if len(self.values) > self.maxsize:
+                self.values.popitem(last=False)
+
+    def delete(self, key: str):
+        with self.lock:
+            self.values.pop(key, None)
+
+
+class FileBackend:
+    """
+    Keep cached responses as files in `directory`, so they are reused across
+    test runs.
+    """
+
+    def __init__(self, directory: str | Path = ".credence_cache"):
+        self.directory = Path(directory)
+        """@private"""
+
+    def get(self, key: str) -> str | None:
+        try:
+            return (self.directory / f"{key}.json").read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    def set(self, key: str, value: str):
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        # Write to a uniquely named temporary file first, so concurrent readers never see a
+        # partial response, even when several processes share the directory
+        tmp_file = tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=self.directory, suffix=".tmp", delete=False)
+        try:
+            with tmp_file:
+                tmp_file.write(value)
+            os.replace(tmp_file.name, self.directory / f"{key}.json")
+        except BaseException:
+            os.unlink(tmp_file.name)
+            raise
+
+    def delete(self, key: str):
+        (self.directory / f"{key}.json").unlink(missing_ok=True)
+
+
+class SqliteBackend:
+    """
+    Keep cached responses in a single SQLite database, so they are reused across
+    test runs. Responses older than `ttl` seconds are ignored and replaced.
+    """
+
+    def __init__(self, path: str | Path = ".credence_cache.sqlite3", ttl: float | None = None):
+        self.ttl = ttl
+        """@private"""
+
+        self.lock = threading.Lock()
+        """@private"""
+
+        self.connection = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        """@private"""
+
+        self.connection.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)")
+
+    def get(self, key: str) -> str | None:
+        with self.lock:
+            row = self.connection.execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+
+        if row is None or (self.ttl is not None and time.time() - row[1] > self.ttl):
+            return None
+        return row[0]
+
+    def set(self, key: str, value: str):
+        with self.lock:
+            self.connection.execute("INSERT OR REPLACE INTO responses (key, value, created_at) VALUES (?, ?, ?)", (key, value, time.time()))
+
+    def delete(self, key: str):
+        with self.lock:
+            self.connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+
+class LLMCache:
+    """
+    `LLMCache` stores the responses to LLM requests made while testing, so
+    that identical requests are answered without calling the LLM again.
+
+    Requests are identified by the model, the request messages and the
+    expected response type, so only enable the cache if your model
+    answers identical requests identically (e.g. `temperature=0`).
+
+    ---
+
+    To cache responses in `.credence_cache/` across runs without changing your
+    adapter, set the `CREDENCE_CACHE=1` environment variable. `CREDENCE_CACHE_DIR`
+    changes the directory.
+
+    To configure the cache yourself, return it from `credence.adapter.Adapter.llm_cache`
+    (or `credence.checker.LLMChecker.llm_cache`):
+
+    ```python
+    from credence.llm_cache import FileBackend, LLMCache
+
+    # Share one cache between all adapter instances
+    llm_cache = LLMCache(FileBackend(".credence_cache"))
+
+    class MyChatbotAdapter(Adapter):
+        def llm_cache(self):
+            return llm_cache
+
+        ... # other required methods
+    ```
+    """
+
+    def __init__(self, backend: CacheBackend | None = None):
+        self.backend = backend or MemoryBackend()
+        """@private"""
+
+    @staticmethod
+    def cache_key(model: str, messages: List[Any], response_model_name: str) -> str:
+        """@private"""
+        payload = {"model": model, "messages": messages, "response_model": response_model_name}
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def create(
+        self,
+        create: Callable[..., Any],
+        model: str,
+        response_model: Any,
+        messages: List[Any],
+        refresh: bool = False,
+        **kwargs: Any,
+    ):
+        """
+        @private
+
+        Return the cached response to the request, calling `create` and
+        caching its response on a miss. `refresh` skips the lookup but still
+        caches the new response.
+        """
+        type_adapter = _type_adapter(response_model)
+        key = self.cache_key(model, messages, response_model.__name__)
+
+        if not refresh:
+            value = self.backend.get(key)
+            if value is not None:
+                return type_adapter.validate_json(value)
+
+        result = create(model=model, response_model=response_model, messages=messages, **kwargs)
+        self.backend.set(key, type_adapter.dump_json(result).decode("utf-8"))
+        return result
+
+
+class SemanticCache(LLMCache):
+    """
+    An `LLMCache` that also reuses the response to an earlier request whose
+    messages mean nearly the same thing, e.g. when generating user messages
+    from the same instruction after a slightly different chatbot reply.
+
+    `embed` turns the text of a request into an embedding. A request reuses
+    the response of the most similar earlier request with the same model and
+    response type if their cosine similarity is at least `threshold`. Only
+    the `maxsize` most recently used embeddings are compared.
+
+    Verdicts of AI checks and assertions are only reused for identical requests.
+    Opposite requirements such as "is written in French" and "is not written in
+    French" embed almost identically, so a similar request could return the
+    opposite verdict.
+
+    ```python
+    from credence.llm_cache import SemanticCache
+
+    openai_client = openai.OpenAI()
+
+    def embed(text):
+        return openai_client.embeddings.create(model="text-embedding-3-small", input=text).data[0].embedding
+
+    llm_cache = SemanticCache(embed, threshold=0.92)
+    ```
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[str], List[float]],
+        threshold: float = 0.92,
+        maxsize: int = 1024,
+        backend: CacheBackend | None = None,
+    ):
+        super().__init__(backend)
+
+        self.embed = embed
+        """@private"""
+
+        self.threshold = threshold
+        """@private"""
+
+        self.maxsize = maxsize
+        """@private"""
+
+        self.embeddings: OrderedDict[str, Tuple[Tuple[str, str], List[float]]] = OrderedDict()
+        """@private The scope and normalized embedding of each cached request"""
+
+        self.lock = threading.Lock()
+        """@private"""
+
+    def create(
+        self,
+        create: Callable[..., Any],
+        model: str,
+        response_model: Any,
+        messages: List[Any],
+        refresh: bool = False,
+        **kwargs: Any,
+    ):
+        """@private"""
+        type_adapter = _type_adapter(response_model)
+        key = self.cache_key(model, messages, response_model.__name__)
+
+        if getattr(response_model, "exact_cache_only", False):
+            return super().create(create, model=model, response_model=response_model, messages=messages, refresh=refresh, **kwargs)
+
+        if not refresh:
+            value = self.backend.get(key)
+            if value is not None:
+                return type_adapter.validate_json(value)
+
+        scope = (model, response_model.__name__)
+        embedding = _normalize(self.embed(_request_text(messages)))
+
+        if not refresh:
+            similar_key = self._most_similar(scope, embedding)
+            value = self.backend.get(similar_key) if similar_key is not None else None
+            if value is not None:
+                return type_adapter.validate_json(value)
+
+        result = create(model=model, response_model=response_model, messages=messages, **kwargs)
+        self.backend.set(key, type_adapter.dump_json(result).decode("utf-8"))
+
+        with self.lock:
+            self.embeddings[key] = (scope, embedding)
+            self.embeddings.move_to_end(key)
+            if len(self.embeddings) > self.maxsize:
+                self.embeddings.popitem(last=False)
+
+        return result
+
+    def _most_similar(self, scope: Tuple[str, str], embedding: List[float]) -> str | None:
+        # Compare against a snapshot, so concurrent requests only hold the lock to copy it
+        with self.lock:
+            entries = [(key, entry_embedding) for key, (entry_scope, entry_embedding) in self.embeddings.items() if entry_scope == scope]
+
+        best_key, best_score = None, self.threshold
+        for key, entry_embedding in entries:
+            # Both embeddings are normalized, so their dot product is the cosine similarity
+            score = sum(map(operator.mul, embedding, entry_embedding))
+            if score >= best_score:
+                best_key, best_score = key, score
+
+        if best_key is not None:
+            with self.lock:
+                if best_key in self.embeddings:
+                    self.embeddings.move_to_end(best_key)
+
+        return best_key
+
+
+def _request_text(messages: List[Any]) -> str:
+    # System prompts are shared by every request of a kind, so they would only dilute the similarity
+    return "\n".join(str(message["content"]) for message in messages if message["role"] != "system")
+
+
+def _normalize(embedding: List[float]) -> List[float]:
+    norm = math.sqrt(sum(value * value for value in embedding)) or 1.0
+    return [value / norm for value in embedding]
+
+
+def cached_create(
+    cache: LLMCache | None,
+    create: Callable[..., Any],
+    model: str,
+    response_model: Any,
+    messages: List[Any],
+    refresh: bool = False,
+    **kwargs: Any,
+):
+    """
+    @private
+
+    Call `create` through `cache`, or directly if no cache is configured.
+    """
+    if cache is None:
+        return create(model=model, response_model=response_model, messages=messages, **kwargs)
+
+    return cache.create(create, model=model, response_model=response_model, messages=messages, refresh=refresh, **kwargs)
+
+
+@lru_cache(maxsize=None)
+def _type_adapter(response_model: Any) -> TypeAdapter:
+    return TypeAdapter(response_model)
+
+
+def cache_from_environment() -> LLMCache | None:
+    """
+    @private
+
+    The file cache enabled by the `CREDENCE_CACHE` environment variable, if any.
+    """
+    if os.environ.get("CREDENCE_CACHE", "") in ("", "0"):
+        return None
+
+    return _file_cache(os.environ.get("CREDENCE_CACHE_DIR", ".credence_cache"))
+
+
+@lru_cache(maxsize=None)
+def _file_cache(directory: str) -> LLMCache:
+    return LLMCache(FileBackend(directory))
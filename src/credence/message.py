@@ -4,7 +4,7 @@ from typing import Any, Dict
 from credence.role import Role
 
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     "@private"
 
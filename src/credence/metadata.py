@@ -1,42 +1,92 @@
-from typing import Dict
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict
 
-from credence.adapter import Adapter
+if TYPE_CHECKING:
+    from credence.adapter import Adapter
 
-active_adapter: Adapter | None = None
-"""@private"""
 
-metadata: Dict[str, str] = {}
-"""@private"""
+class _State:
+    """
+    @private
 
+    The active adapter and the metadata collected for its current chatbot message.
 
-def set_adapter(adapter: Adapter | None):
-    global active_adapter
-    active_adapter = adapter
+    The adapter is held through a weak reference, so it is cleared once the
+    adapter is no longer used.
+    """
+
+    def __init__(self):
+        self.active_adapter: "weakref.ref[Adapter] | None" = None
+        self.metadata: Dict[str, str] = {}
+
+
+_global_state = _State()
+"""@private Shared by every thread, so chatbots can collect metadata from their own worker threads"""
+
+_local = threading.local()
+"""@private Holds the state of threads running an `isolated` conversation"""
+
+
+def _current() -> _State:
+    state = getattr(_local, "state", None)
+    return state if state is not None else _global_state
+
+
+@contextmanager
+def isolated():
+    """
+    @private
+
+    Give the current thread its own adapter and metadata while the block runs.
+    `Adapter.run_conversations` uses this to test several conversations at once,
+    so metadata must be collected on the thread running the conversation.
+    """
+    previous = getattr(_local, "state", None)
+    _local.state = _State()
+    try:
+        yield
+    finally:
+        _local.state = previous
+
+
+def set_adapter(adapter: "Adapter | None"):
+    _current().active_adapter = weakref.ref(adapter) if adapter is not None else None
+
+
+def get_adapter() -> "Adapter | None":
+    active_adapter = _current().active_adapter
+    return active_adapter() if active_adapter is not None else None
 
 
 def clear_adapter():
-    global active_adapter
-    active_adapter = None
+    _current().active_adapter = None
 
 
 def clear():
-    global metadata
-    metadata = {}
+    _current().metadata = {}
 
 
 def get_values():
-    return metadata
+    return _current().metadata
 
 
 def get_value(key: str):
     try:
-        global metadata
-        return metadata[key]
+        return _current().metadata[key]
     except KeyError as e:
-        keys = ", ".join([f"`{k}`" for k in metadata.keys()])
-        raise Exception(f"Could not find `{key}` in metadata. Available keys are: [{keys}]") from e
+        raise missing_key_error(key) from e
+
+
+def missing_key_error(key: str) -> Exception:
+    keys = ", ".join([f"`{k}`" for k in _current().metadata.keys()])
+    return Exception(f"Could not find `{key}` in metadata. Available keys are: [{keys}]")
 
 
 def set_value(key: str, value: str):
-    global metadata
-    metadata[key] = value
+    _current().metadata[key] = value
+
+
+def set_values(values: Dict[str, str]):
+    _current().metadata.update(values)
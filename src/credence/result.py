@@ -1,3 +1,4 @@
+import sys
 import tempfile
 from dataclasses import dataclass
 from html import escape
@@ -5,18 +6,19 @@ from pathlib import Path
 from typing import Any, List
 
 from markdowngenerator import MarkdownGenerator
-from termcolor import cprint
+from termcolor import colored
 
 from credence.conversation import Conversation
 from credence.exceptions import ColoredException
 from credence.interaction.chatbot import ChatbotIgnoresMessage, ChatbotResponds
+from credence.interaction.external import External
 from credence.interaction.nested_conversation import NestedConversation
 from credence.interaction.user import UserGenerated, UserMessage
 from credence.message import Message
 from credence.role import Role
 
 
-@dataclass
+@dataclass(slots=True)
 class Result:
     messages: List[Message]
     errors: List[Any]
@@ -25,36 +27,34 @@ class Result:
     testing_time_ms: int
 
     def to_stdout(self):
-        cprint("")
-        cprint("------------ Result ------------", attrs=["bold"])
-        cprint(self.conversation.title)
-        cprint("------------------------------------")
-        cprint(f"  Total Time:  {(self.chatbot_time_ms + self.testing_time_ms) / 1000}s")
-        cprint(f"   Test Time:  {self.testing_time_ms / 1000}s")
-        cprint(f"Chatbot Time:  {self.chatbot_time_ms / 1000}s")
-        cprint("------------------------------------\n", attrs=["bold"])
-
-        for message in self.messages:
-            if message.role == Role.User:
-                color = "blue"
-                name = "user: "
-            if message.role == Role.Chatbot:
-                color = "green"
-                name = "asst: "
-
-            cprint(name, color, attrs=["bold"], end="")
-            cprint(message.body)
+        bold = ["bold"]
+        lines = [
+            "",
+            colored("------------ Result ------------", attrs=bold),
+            self.conversation.title,
+            "------------------------------------",
+            f"  Total Time:  {(self.chatbot_time_ms + self.testing_time_ms) / 1000}s",
+            f"   Test Time:  {self.testing_time_ms / 1000}s",
+            f"Chatbot Time:  {self.chatbot_time_ms / 1000}s",
+            colored("------------------------------------\n", attrs=bold),
+        ]
+
+        # Color each role's name once rather than once per message
+        prefixes = {role: colored(name, color, attrs=bold) for role, (color, name) in _ROLE_STYLES.items()}
+        lines.extend(prefixes[message.role] + message.body for message in self.messages)
 
         if self.errors:
-            cprint("-------------- Errors --------------", "red", attrs=["bold"])
+            lines.append(colored("-------------- Errors --------------", "red", attrs=bold))
+            lines.extend(
+                f"{index}. {error.colored_message}" if isinstance(error, ColoredException) else colored(f"{index}. {error}", "red", attrs=[])
+                for index, error in enumerate(self.errors, 1)
+            )
 
-            for index, error in enumerate(self.errors, 1):
-                if isinstance(error, ColoredException):
-                    print(f"{index}. {error.colored_message}")
-                else:
-                    cprint(f"{index}. {error}", "red", attrs=[])
+        lines.append("")
 
-        cprint("")
+        # Write the whole report at once
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
 
     def to_markdown(self, index=None):
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -97,8 +97,6 @@ class Result:
         return "".join(doc.document_data_array)
 
     def _add_conversation(self, doc: MarkdownGenerator, conversation: Conversation, messages: List[Message]):
-        from credence.interaction.external import External
-
         for interaction in conversation.interactions:
             if isinstance(interaction, NestedConversation):
                 with DetailsAndSummary(doc, "🧵 " + interaction.name):
@@ -111,7 +109,7 @@ class Result:
                 message = messages[0]
                 messages.remove(message)
 
-                if message.role == Role.User:
+                if message.role is Role.User:
                     title = f"<code>user:</code> {escape(message.body, quote=False)}"
                     with DetailsAndSummary(doc, title, escape_html=False):
                         pass
@@ -124,10 +122,8 @@ class Result:
                 message = messages[0]
                 messages.remove(message)
 
-                if message.role == Role.Chatbot:
-                    failed = False
-                    for expectation in interaction.expectations:
-                        failed = failed or not expectation.passed
+                if message.role is Role.Chatbot:
+                    failed = any(expectation.passed is False for expectation in interaction.expectations)
 
                     name = f"asst{' ❌' if failed else ''}:"
                     with DetailsAndSummary(doc, f"<code>{name}</code>  {escape(message.body, quote=False)}", escape_html=False):
@@ -136,13 +132,13 @@ class Result:
                         if interaction.expectations != []:
                             marks = []
                             for expectation in interaction.expectations:
-                                marks.append("✅" if expectation.passed else "❌")
+                                marks.append(_CHECK_MARKS[expectation.passed])
 
                             marks = " ".join(marks)
 
                             with DetailsAndSummary(doc, f"Checks <code>{marks}</code>", escape_html=False):
                                 for expectation in interaction.expectations:
-                                    prefix = "`✅`" if expectation.passed else "`❌`"
+                                    prefix = f"`{_CHECK_MARKS[expectation.passed]}`"
                                     doc.writeText(f"  * {prefix} {escape(expectation.humanize(), quote=False)}")
                                 doc.writeTextLine()
 
@@ -187,5 +183,20 @@ class DetailsAndSummary:
         self.doc.endDetailsAndSummary()
 
 
+_ROLE_STYLES = {
+    Role.User: ("blue", "user: "),
+    Role.Chatbot: ("green", "asst: "),
+}
+"""@private The color and name used when printing a message from each role"""
+
+
+_CHECK_MARKS = {
+    True: "✅",
+    False: "❌",
+    None: "➖",
+}
+"""@private The mark shown for passed, failed and skipped checks"""
+
+
 def _ms_to_s(ms):
     return f"{ms / 1000}s"
@@ -1,7 +1,9 @@
 import logging
 from enum import Enum
+from typing import TYPE_CHECKING
 
-from openai.types.chat import ChatCompletionAssistantMessageParam, ChatCompletionUserMessageParam
+if TYPE_CHECKING:
+    from openai.types.chat import ChatCompletionMessageParam
 
 """@private"""
 
@@ -16,15 +18,20 @@ class Role(str, Enum):
     User = "user"
 
     def invert(self):
-        match self:
-            case Role.Chatbot:
-                return Role.User
-            case Role.User:
-                return Role.Chatbot
-
-    def to_llm_message(self, message: str):
-        match self:
-            case Role.Chatbot:
-                return ChatCompletionUserMessageParam(role="user", content=message)
-            case Role.User:
-                return ChatCompletionAssistantMessageParam(role="assistant", content=message)
+        return _INVERTED_ROLES[self]
+
+    def to_llm_message(self, message: str) -> "ChatCompletionMessageParam":
+        # The simulated user sees the conversation from the other side,
+        # so chatbot messages are sent as `user` messages and vice versa.
+        return {"role": _LLM_ROLES[self], "content": message}
+
+
+_LLM_ROLES = {
+    Role.Chatbot: "user",
+    Role.User: "assistant",
+}
+
+_INVERTED_ROLES = {
+    Role.Chatbot: Role.User,
+    Role.User: Role.Chatbot,
+}
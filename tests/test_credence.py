@@ -1,22 +1,32 @@
+import asyncio
+import json
 import os
 import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
 from textwrap import dedent
+from types import SimpleNamespace
 from typing import List, Tuple
 
+import httpx
 import instructor
 import openai
 import pytest
-from credence.checker import LLMChecker
+from credence.checker import AssertionCheck, LLMChecker
 from support.math_chatbot import MathChatbot
 
 from credence.adapter import Adapter, Role
+from credence.async_adapter import AsyncAdapter
 from credence.conversation import Conversation
+from credence.interaction import Interaction
 from credence.interaction.chatbot import Chatbot
 from credence.interaction.chatbot.check.metadata import Metadata
 from credence.interaction.chatbot.check.response import Response
 from credence.interaction.external import External
-from credence.interaction.user import User
+from credence.interaction.user import User, UserMessage
+from credence.llm_cache import FileBackend, LLMCache, MemoryBackend, SemanticCache, SqliteBackend
 from credence.message import Message
 
 
@@ -229,6 +239,447 @@ def test_assert_that():
 
 
 
+def test_client_is_created_once():
+    class CountingAdapter(MathChatbotAdapter):
+        created = 0
+
+        def create_client(self):
+            self.created += 1
+            return object()
+
+    adapter = CountingAdapter()
+    assert adapter.client is adapter.client
+    assert adapter.get_client() is adapter.client
+    assert adapter.created == 1
+    assert CountingAdapter().client is not adapter.client
+
+    class SharedAdapter(CountingAdapter):
+        share_client = True
+
+    shared_adapter = SharedAdapter()
+    other_adapter = SharedAdapter()
+    assert other_adapter.client is shared_adapter.client
+    assert shared_adapter.created + other_adapter.created == 1
+
+    SharedAdapter.clear_shared_clients()
+    assert SharedAdapter().client is not shared_adapter.client
+
+    class CountingChecker(MyLLMChecker):
+        created = 0
+
+        def create_client(self):
+            self.created += 1
+            return object()
+
+    checker = CountingChecker()
+    assert checker.client is checker.get_client()
+    assert checker.client is checker.client
+    assert checker.created == 1
+
+
+def test_client_is_prewarmed():
+    class PrewarmedAdapter(MathChatbotAdapter):
+        prewarm_client = True
+        threads = []
+
+        def create_client(self):
+            self.threads.append(threading.current_thread().name)
+
+            def create(model, response_model, messages, max_retries):
+                return response_model(requirement="", reason="", requirement_met=True)
+
+            return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    scripted = Conversation(title="scripted", interactions=[User.message("Hi"), Chatbot.responds([])])
+    ai_checked = Conversation(title="prewarm", interactions=[User.message("Hi"), Chatbot.responds([Response.ai_check(should="greet the user")])])
+
+    # Conversations that never call the LLM don't create a client
+    adapter = PrewarmedAdapter()
+    assert adapter.test(scripted).errors == []
+    assert adapter.client_future is None
+    assert adapter.threads == []
+
+    adapter = PrewarmedAdapter()
+    assert adapter.test(ai_checked).errors == []
+    assert adapter.client is adapter.client_future.result()
+    assert len(adapter.threads) == 1
+    assert adapter.threads[0].startswith("credence-client")
+
+    class FailingAdapter(PrewarmedAdapter):
+        def create_client(self):
+            raise Exception("could not create client")
+
+    result = FailingAdapter().test(ai_checked)
+    assert [str(error) for error in result.errors] == ["could not create client"]
+
+
+def test_adapter_lifecycle():
+    from credence import metadata
+
+    with MathChatbotAdapter() as adapter:
+        assert metadata.get_adapter() is adapter
+    assert metadata.get_adapter() is None
+
+    adapter = MathChatbotAdapter()
+    assert metadata.get_adapter() is adapter
+    del adapter
+    assert metadata.get_adapter() is None
+
+
+def test_metadata_collected_from_a_worker_thread():
+    class WorkerThreadAdapter(MathChatbotAdapter):
+        def handle_message(self, message: str):
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                return executor.submit(super().handle_message, message).result()
+
+    result = WorkerThreadAdapter().test(
+        Conversation(
+            title="metadata from a worker thread",
+            interactions=[
+                User.message("Hi"),
+                Chatbot.responds([Metadata("chatbot.handler").equals("greeting")]),
+            ],
+        )
+    )
+
+    assert result.errors == []
+
+
+def test_interaction_subclasses_are_dispatched():
+    @dataclass
+    class Greeting(UserMessage):
+        pass
+
+    class Unknown(Interaction):
+        def is_user_interaction(self) -> bool:
+            return False
+
+        def is_chatbot_interaction(self) -> bool:
+            return False
+
+    result = MathChatbotAdapter().test(
+        Conversation(
+            title="subclassed interactions",
+            interactions=[
+                Greeting(text="Hello"),
+                Unknown(),
+                Chatbot.responds([Response.contains("there")]),
+            ],
+        )
+    )
+
+    assert result.errors == []
+    assert [message.body for message in result.messages] == ["Hello", "Hello there. My name is Credence"]
+    assert Greeting not in Adapter.interaction_handlers
+
+    class ShoutingAdapter(MathChatbotAdapter):
+        def _handle_user_message(self, interaction: UserMessage):
+            super()._handle_user_message(UserMessage(text=interaction.text.upper()))
+
+    result = ShoutingAdapter().test(Conversation(title="overridden handler", interactions=[Greeting(text="Hello")]))
+    assert [message.body for message in result.messages] == ["HELLO"]
+
+
+def test_run_conversations():
+    conversations = [
+        Conversation(
+            title=f"adds {n} and {n}",
+            interactions=[
+                External("register_user", {"name": "John"}),
+                User.message(f"math:{n} + {n}"),
+                Chatbot.responds(
+                    [
+                        Response.equals(str(n + n)),
+                        Metadata("chatbot.math.result").equals(str(n + n)),
+                    ]
+                ),
+            ],
+        )
+        for n in range(20)
+    ]
+
+    results = MathChatbotAdapter.run_conversations(conversations, max_concurrency=4)
+
+    assert [result.conversation for result in results] == conversations
+    assert [result.errors for result in results] == [[]] * len(conversations)
+
+    results = asyncio.run(MathChatbotAdapter.arun_conversations(conversations, max_concurrency=4))
+
+    assert [result.conversation for result in results] == conversations
+    assert [result.errors for result in results] == [[]] * len(conversations)
+
+
+def test_async_adapter():
+    class AsyncMathChatbotAdapter(AsyncAdapter):
+        def __init__(self):
+            super().__init__()
+            self.chatbot = MathChatbot()
+
+        async def handle_message(self, message: str):
+            await asyncio.sleep(0)
+            return self.chatbot.handle_message(user=self.context.get("user"), message=message)
+
+        async def register_user(self, name: str):
+            await asyncio.sleep(0)
+            self.context["user"] = name
+
+        def create_client(self):
+            raise Exception("The client should not be used")
+
+        def model_name(self):
+            return "model"
+
+    conversation = Conversation(
+        title="async chatbot",
+        interactions=[
+            External("register_user", {"name": "John"}),
+            User.message("Hi"),
+            Chatbot.responds([Response.equals("Hi, John. My name is Credence"), Metadata("chatbot.handler").equals("greeting")]),
+        ],
+    )
+
+    assert AsyncMathChatbotAdapter().test(conversation).errors == []
+    assert asyncio.run(AsyncMathChatbotAdapter().atest(conversation)).errors == []
+
+
+def test_missing_metadata_key():
+    missing_check = Metadata("chatbot.missing").equals("value")
+    result = MathChatbotAdapter().test(
+        Conversation(
+            title="missing metadata key",
+            interactions=[
+                User.message("Hi"),
+                Chatbot.responds([missing_check]),
+            ],
+        )
+    )
+
+    assert len(result.errors) == 1
+    assert str(result.errors[0]) == "Could not find `chatbot.missing` in metadata. Available keys are: [`chatbot.handler`]"
+    assert not missing_check.passed
+
+
+def test_ai_checks_are_skipped_after_a_local_check_fails():
+    class NoClientAdapter(MathChatbotAdapter):
+        prewarm_client = False
+
+        def create_client(self):
+            raise Exception("AI checks should not run")
+
+    ai_check = Response.ai_check(should="greet the user")
+    result = NoClientAdapter().test(
+        Conversation(
+            title="failing local check",
+            interactions=[
+                User.message("Hi"),
+                Chatbot.responds([ai_check, Response.contains("Goodbye")]),
+            ],
+        )
+    )
+
+    assert len(result.errors) == 1
+    assert "Goodbye" in str(result.errors[0])
+    assert ai_check.passed is None
+    assert "<code>➖ ❌</code>" in result.to_markdown()
+
+
+def test_ai_checks_run_concurrently():
+    # Every request waits for the others, so the checks only pass if they run at the same time
+    barrier = threading.Barrier(3, timeout=5)
+
+    class ConcurrentChecksAdapter(MathChatbotAdapter):
+        def create_client(self):
+            def create(model, response_model, messages, max_retries):
+                barrier.wait()
+                return response_model(requirement="", reason="", requirement_met=True)
+
+            return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    result = ConcurrentChecksAdapter().test(
+        Conversation(
+            title="concurrent AI checks",
+            interactions=[
+                User.message("Hi"),
+                Chatbot.responds([Response.ai_check(should="greet the user"), Response.ai_check(should="be polite"), Response.ai_check(should="be brief")]),
+            ],
+        )
+    )
+
+    assert result.errors == []
+
+
+def test_user_messages_are_generated_through_the_raw_client():
+    requests = []
+    contents = ["Hello, I'm John", None]
+
+    def handle_request(request: httpx.Request):
+        requests.append(json.loads(request.content))
+        message = {"role": "assistant", "content": contents[len(requests) - 1]}
+        return httpx.Response(
+            200,
+            json={
+                "id": "chatcmpl-test",
+                "object": "chat.completion",
+                "created": 0,
+                "model": "model",
+                "choices": [{"index": 0, "message": message, "finish_reason": "stop"}],
+            },
+        )
+
+    class RawClientAdapter(MathChatbotAdapter):
+        def create_client(self):
+            client = openai.OpenAI(api_key="test", http_client=httpx.Client(transport=httpx.MockTransport(handle_request)))
+            return instructor.from_openai(client, mode=instructor.Mode.TOOLS)
+
+    conversation = Conversation(
+        title="raw client",
+        interactions=[
+            User.generated("Introduce yourself as John"),
+            Chatbot.responds([Response.contains("Hello")]),
+        ],
+    )
+
+    result = RawClientAdapter().test(conversation)
+    assert result.errors == []
+    assert result.messages[0].body == "Hello, I'm John"
+    # Plain text requests skip instructor's tool definitions
+    assert "tools" not in requests[0]
+
+    result = RawClientAdapter().test(conversation)
+    assert [str(error) for error in result.errors] == ["The LLM did not generate a user message"]
+
+
+def test_user_simulator_history_window():
+    requests = []
+
+    class WindowedAdapter(MathChatbotAdapter):
+        def create_client(self):
+            def create(model, response_model, messages):
+                requests.append(messages)
+                return "Hello"
+
+            return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+        def user_simulator_history_window(self):
+            return 1
+
+    result = WindowedAdapter().test(
+        Conversation(
+            title="windowed history",
+            interactions=[
+                User.message("Hi"),
+                Chatbot.responds([]),
+                User.generated("Greet the chatbot again"),
+                Chatbot.responds([]),
+            ],
+        )
+    )
+
+    assert result.errors == []
+    assert requests[0][1:] == [
+        {"role": "user", "content": "Hello there. My name is Credence"},
+        {"role": "user", "content": "Greet the chatbot again"},
+    ]
+
+
+def test_llm_cache():
+    calls = []
+
+    def create(model, response_model, messages):
+        calls.append(messages)
+        return f"response {len(calls)}"
+
+    def request(cache: LLMCache, content: str, refresh: bool = False):
+        return cache.create(
+            create,
+            model="model",
+            response_model=str,
+            messages=[{"role": "user", "content": content}],
+            refresh=refresh,
+        )
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for backend in [MemoryBackend(), FileBackend(tmpdir), SqliteBackend(Path(tmpdir) / "cache.sqlite3")]:
+            calls.clear()
+            cache = LLMCache(backend)
+
+            assert request(cache, "Hi") == "response 1"
+            assert request(cache, "Hi") == "response 1"
+            assert request(cache, "Hello") == "response 2"
+            assert request(cache, "Hi", refresh=True) == "response 3"
+            assert request(cache, "Hi") == "response 3"
+            assert len(calls) == 3
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        backend = SqliteBackend(Path(tmpdir) / "cache.sqlite3", ttl=60)
+        backend.set("key", "value")
+        assert backend.get("key") == "value"
+        backend.ttl = 0
+        assert backend.get("key") is None
+        backend.delete("key")
+        backend.ttl = 60
+        assert backend.get("key") is None
+
+    cache = LLMCache(MemoryBackend(maxsize=1))
+    calls.clear()
+    request(cache, "Hi")
+    request(cache, "Hello")
+    request(cache, "Hi")
+    assert len(calls) == 3
+
+
+def test_semantic_cache():
+    calls = []
+
+    def create(model, response_model, messages):
+        calls.append(messages)
+        return f"response {len(calls)}"
+
+    def embed(text):
+        words = text.split()
+        return [words.count(word) for word in ["give", "a", "greeting", "message", "farewell"]]
+
+    def request(cache: LLMCache, content: str, model: str = "model"):
+        return cache.create(create, model=model, response_model=str, messages=[{"role": "user", "content": content}])
+
+    cache = SemanticCache(embed, threshold=0.85)
+    assert request(cache, "give a greeting") == "response 1"
+    assert request(cache, "give a greeting message") == "response 1"
+    assert request(cache, "give a farewell") == "response 2"
+    assert request(cache, "give a greeting message", model="other") == "response 3"
+    assert len(calls) == 3
+
+    # Verdicts are never reused for a merely similar assertion, since negations embed almost identically
+    verdicts = []
+
+    def check(model, response_model, messages):
+        verdicts.append(messages)
+        return response_model(assertion="", reason="", assertion_is_true="not" not in messages[0]["content"])
+
+    def assert_that(assertion: str):
+        return cache.create(check, model="model", response_model=AssertionCheck, messages=[{"role": "user", "content": assertion}])
+
+    cache = SemanticCache(lambda text: [1.0], threshold=0.5)
+    assert assert_that("is written in French").assertion_is_true
+    assert not assert_that("is not written in French").assertion_is_true
+    assert assert_that("is written in French").assertion_is_true
+    assert len(verdicts) == 2
+
+
+def test_llm_cache_from_environment(monkeypatch):
+    monkeypatch.delenv("CREDENCE_CACHE", raising=False)
+    assert MathChatbotAdapter().llm_cache() is None
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        monkeypatch.setenv("CREDENCE_CACHE", "1")
+        monkeypatch.setenv("CREDENCE_CACHE_DIR", tmpdir)
+
+        cache = MathChatbotAdapter().llm_cache()
+        assert isinstance(cache.backend, FileBackend)
+        assert cache.backend.directory == Path(tmpdir)
+        assert MathChatbotAdapter().llm_cache() is cache
+
+
 def test_checks():
     # METADATA
     assert Metadata("key").contains(string="bc").find_error("abcd") is None